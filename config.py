@@ -3,9 +3,12 @@
 import os
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
+# Load environment variables from .env file (once, on first import)
 load_dotenv()
 
+# OpenAI Configuration
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
 # MongoDB Configuration
 MONGODB_PASSWORD = os.getenv("MONGODB_PASSWORD")
 MONGODB_URI = os.getenv(
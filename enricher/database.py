@@ -3,21 +3,40 @@ Database handler for storing enriched community data.
 """
 
 import sqlite3
+import orjson
+import zstandard
 from openai_enricher import CommunityInfo
 
 
 # Default database file path
 DB_PATH = "communities.db"
 
+# Applied to every connection (journal_mode persists, the rest are per-connection)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 64 MB
+)
 
-def init_database(db_path: str = DB_PATH) -> None:
+# Enriched data is stored as zstd-compressed compact JSON
+_compressor = zstandard.ZstdCompressor(level=3)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def init_database(
+    db_path: str = DB_PATH, conn: sqlite3.Connection | None = None
+) -> None:
     """
     Initialize SQLite database with communities table.
 
     Args:
         db_path: Path to the SQLite database file
+        conn: Optional open connection to reuse instead of opening a new one
     """
-    conn = sqlite3.connect(db_path)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_connection(db_path)
     cursor = conn.cursor()
 
     cursor.execute(
@@ -25,28 +44,46 @@ def init_database(db_path: str = DB_PATH) -> None:
         CREATE TABLE IF NOT EXISTS communities (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             url TEXT UNIQUE NOT NULL,
-            enriched_data TEXT NOT NULL,
+            enriched_data BLOB NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """
     )
 
-    # Create index on URL for faster lookups
-    cursor.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_url ON communities(url)
-    """
-    )
+    # The UNIQUE constraint already indexes url; drop the old duplicate index
+    # so inserts only maintain one
+    cursor.execute("DROP INDEX IF EXISTS idx_url")
 
     conn.commit()
-    conn.close()
+    if owns_conn:
+        conn.close()
     print(f"✅ Database initialized at {db_path}")
 
 
+def decode_enriched_data(value: bytes | str) -> str:
+    """
+    Decode a stored enriched_data value back to a JSON string.
+
+    Args:
+        value: Compressed JSON blob, or plain JSON text for rows saved
+            before compression was introduced
+
+    Returns:
+        JSON string of enriched data
+    """
+    if isinstance(value, str):
+        return value
+    return _decompressor.decompress(value).decode()
+
+
 def get_connection(db_path: str = DB_PATH) -> sqlite3.Connection:
     """
-    Get a database connection.
+    Get a database connection tuned for write-heavy ingest.
+
+    WAL with synchronous=NORMAL skips the fsync on every commit; the database
+    stays consistent, but the last few commits may be lost on power failure.
+    That's acceptable here since lost rows are simply re-enriched next run.
 
     Args:
         db_path: Path to the SQLite database file
@@ -54,31 +91,45 @@ def get_connection(db_path: str = DB_PATH) -> sqlite3.Connection:
     Returns:
         SQLite connection object
     """
-    return sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
 
 
-def url_exists(db_path: str, url: str) -> bool:
+def url_exists(db_path: str, url: str, conn: sqlite3.Connection | None = None) -> bool:
     """
     Check if URL already exists in the database.
 
+    For bulk checks prefer loading ``get_all_urls`` into a set once.
+
     Args:
         db_path: Path to the SQLite database file
         url: URL to check
+        conn: Optional open connection to reuse instead of opening a new one
 
     Returns:
         True if URL exists, False otherwise
     """
-    conn = get_connection(db_path)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_connection(db_path)
     cursor = conn.cursor()
 
     cursor.execute("SELECT COUNT(*) FROM communities WHERE url = ?", (url,))
     count = cursor.fetchone()[0]
 
-    conn.close()
+    if owns_conn:
+        conn.close()
     return count > 0
 
 
-def save_community_data(db_path: str, url: str, enriched_data: CommunityInfo) -> None:
+def save_community_data(
+    db_path: str,
+    url: str,
+    enriched_data: CommunityInfo,
+    conn: sqlite3.Connection | None = None,
+) -> None:
     """
     Save enriched community data to the database.
 
@@ -86,61 +137,81 @@ def save_community_data(db_path: str, url: str, enriched_data: CommunityInfo) ->
         db_path: Path to the SQLite database file
         url: URL of the community
         enriched_data: Enriched community data as CommunityInfo object
+        conn: Optional open connection; the caller is responsible for committing
     """
-    conn = get_connection(db_path)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_connection(db_path)
     cursor = conn.cursor()
 
-    # Convert CommunityInfo to JSON string
-    json_data = enriched_data.model_dump_json(indent=2)
+    # Convert CommunityInfo to compressed compact JSON
+    json_data = _compressor.compress(orjson.dumps(enriched_data.model_dump()))
 
     cursor.execute(
         """
-        INSERT OR REPLACE INTO communities (url, enriched_data, updated_at)
-        VALUES (?, ?, CURRENT_TIMESTAMP)
+        INSERT INTO communities (url, enriched_data)
+        VALUES (?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            enriched_data = excluded.enriched_data,
+            updated_at = CURRENT_TIMESTAMP
     """,
         (url, json_data),
     )
 
-    conn.commit()
-    conn.close()
+    # Callers passing a shared connection control when to commit
+    if owns_conn:
+        conn.commit()
+        conn.close()
 
 
-def get_community_data(db_path: str, url: str) -> str | None:
+def get_community_data(
+    db_path: str, url: str, conn: sqlite3.Connection | None = None
+) -> str | None:
     """
     Retrieve enriched community data from the database.
 
     Args:
         db_path: Path to the SQLite database file
         url: URL of the community
+        conn: Optional open connection to reuse instead of opening a new one
 
     Returns:
         JSON string of enriched data, or None if not found
     """
-    conn = get_connection(db_path)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_connection(db_path)
     cursor = conn.cursor()
 
     cursor.execute("SELECT enriched_data FROM communities WHERE url = ?", (url,))
     result = cursor.fetchone()
 
-    conn.close()
-    return result[0] if result else None
+    if owns_conn:
+        conn.close()
+    return decode_enriched_data(result[0]) if result else None
 
 
-def get_all_urls(db_path: str = DB_PATH) -> list[str]:
+def get_all_urls(
+    db_path: str = DB_PATH, conn: sqlite3.Connection | None = None
+) -> list[str]:
     """
     Get all URLs stored in the database.
 
     Args:
         db_path: Path to the SQLite database file
+        conn: Optional open connection to reuse instead of opening a new one
 
     Returns:
         List of URLs
     """
-    conn = get_connection(db_path)
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_connection(db_path)
     cursor = conn.cursor()
 
     cursor.execute("SELECT url FROM communities")
     urls = [row[0] for row in cursor.fetchall()]
 
-    conn.close()
+    if owns_conn:
+        conn.close()
     return urls
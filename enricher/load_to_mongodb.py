@@ -2,13 +2,14 @@
 Load enriched community data from SQLite database to MongoDB.
 """
 
-import json
 import logging
+from functools import lru_cache
 from datetime import datetime
 from typing import Dict, Any, List
 
-from pymongo import MongoClient
-from pymongo.errors import BulkWriteError
+import orjson
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 import sys
 from pathlib import Path
@@ -18,7 +19,7 @@ from config import (
     MONGODB_COLLECTION,
     validate_config,
 )
-from enricher.database import get_connection, DB_PATH
+from enricher.database import get_connection, decode_enriched_data, DB_PATH
 
 
 # Add project root to path for imports
@@ -34,14 +35,56 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Name MongoDB gives the single-field index on data_source
+DATA_SOURCE_INDEX = "data_source_1"
 
-def transform_community_data(sqlite_data: Dict[str, Any], url: str) -> Dict[str, Any]:
+# Normalized pricing models keyed by lowercase enricher output; anything
+# else containing "free" maps to FREE, the rest to PAID
+PRICING_MODEL_MAP = {
+    "free": "FREE",
+    "freemium": "FREEMIUM",
+    "paid": "PAID",
+    "premium": "PAID",
+    "subscription": "PAID",
+}
+
+
+@lru_cache(maxsize=1)
+def get_mongo_client() -> MongoClient:
+    """
+    Get the shared MongoDB client, creating it on first use.
+
+    The client owns a connection pool, so reusing it across loads avoids
+    repeating the TCP/TLS handshake with the cluster.
+
+    Returns:
+        MongoClient instance
+    """
+    return MongoClient(
+        MONGODB_URI,
+        maxPoolSize=50,
+        minPoolSize=5,
+        retryWrites=True,
+        w="majority",
+        # zstd needs the zstandard package; zlib is the built-in fallback
+        compressors="zstd,zlib",
+    )
+
+
+def transform_community_data(
+    sqlite_data: Dict[str, Any],
+    url: str,
+    current_date: str,
+    current_timestamp: str,
+) -> Dict[str, Any]:
     """
     Transform SQLite community data to MongoDB document format.
 
     Args:
         sqlite_data: Community data from SQLite (parsed JSON)
         url: Original URL of the community
+        current_date: Load date (YYYY-MM-DD) for created_at/updated_at
+        current_timestamp: Load time (ISO 8601) for last_verified_at
 
     Returns:
         Transformed document ready for MongoDB
@@ -60,20 +103,13 @@ def transform_community_data(sqlite_data: Dict[str, Any], url: str) -> Dict[str,
     # Normalize pricing model to uppercase
     pricing_model = sqlite_data.get("pricing_model")
     if pricing_model:
-        pricing_model = pricing_model.upper()
-        if pricing_model in ["FREE", "FREEMIUM", "PAID"]:
-            pass  # Keep as is
-        elif "free" in pricing_model.lower():
-            pricing_model = "FREE"
-        else:
-            pricing_model = "PAID"
+        key = pricing_model.strip().lower()
+        pricing_model = PRICING_MODEL_MAP.get(key) or (
+            "FREE" if "free" in key else "PAID"
+        )
     else:
         pricing_model = None
 
-    # Get current date for timestamps
-    current_date = datetime.now().strftime("%Y-%m-%d")
-    current_timestamp = datetime.now().isoformat()
-
     # Build MongoDB document
     mongo_doc = {
         "name": sqlite_data.get("name", ""),
@@ -105,20 +141,156 @@ def transform_community_data(sqlite_data: Dict[str, Any], url: str) -> Dict[str,
     return mongo_doc
 
 
-def load_sqlite_to_mongodb(db_path: str = DB_PATH, batch_size: int = 100) -> None:
+def ensure_data_source_index(collection) -> None:
+    """
+    Ensure the unique data_source index used to key upserts.
+
+    Collections loaded by earlier versions of this script (plain inserts on
+    every run) can hold duplicate data_source values, which makes the unique
+    index build fail. In that case a non-unique index is created instead so
+    upserts stay fast, and the duplicates are left for manual cleanup. The
+    non-unique fallback shares the unique index's name, so it is dropped
+    before each retry; once the duplicates are gone the unique build succeeds.
+
+    Args:
+        collection: MongoDB collection to index
+    """
+    index = collection.index_information().get(DATA_SOURCE_INDEX)
+    if index is not None and not index.get("unique"):
+        collection.drop_index(DATA_SOURCE_INDEX)
+
+    try:
+        collection.create_index("data_source", unique=True)
+    except DuplicateKeyError as e:
+        logger.error(
+            f"Could not create unique index on data_source ({e}). "
+            "The collection has duplicate data_source values from earlier loads; "
+            "dedupe data_source (keep one document per URL) and re-run to enable "
+            "the unique index. Continuing with a non-unique index."
+        )
+        collection.create_index("data_source")
+
+
+def transform_community_rows(
+    rows: List[tuple[str, bytes | str]],
+    current_date: str,
+    current_timestamp: str,
+) -> tuple[List[Dict[str, Any]], int]:
+    """
+    Parse and transform SQLite rows into MongoDB documents.
+
+    Each row goes through transform_community_data; the loader calls this
+    once per fetched batch and writes the result with a single bulk call.
+
+    Args:
+        rows: (url, enriched_data) rows from SQLite
+        current_date: Load date (YYYY-MM-DD) for created_at/updated_at
+        current_timestamp: Load time (ISO 8601) for last_verified_at
+
+    Returns:
+        Tuple of (documents, failed) where failed counts rows that could not
+        be parsed or transformed
+    """
+    documents: List[Dict[str, Any]] = []
+    failed = 0
+
+    for url, json_data in rows:
+        try:
+            # Parse JSON data from SQLite
+            sqlite_data = orjson.loads(decode_enriched_data(json_data))
+
+            # Transform to MongoDB format
+            documents.append(
+                transform_community_data(
+                    sqlite_data, url, current_date, current_timestamp
+                )
+            )
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON for URL {url}: {e}")
+            failed += 1
+        except Exception as e:
+            logger.error(f"Failed to process URL {url}: {e}")
+            failed += 1
+
+    return documents, failed
+
+
+def upsert_documents(collection, documents: List[Dict[str, Any]]) -> tuple[int, int]:
+    """
+    Upsert a batch of documents keyed on data_source.
+
+    Uses an unordered bulk write so one bad document doesn't stop the rest,
+    and re-running a load updates existing documents instead of duplicating.
+    created_at is only set when a document is first inserted.
+
+    Args:
+        collection: MongoDB collection to write to
+        documents: Transformed community documents
+
+    Returns:
+        Tuple of (written, failed) document counts
+    """
+    operations = []
+    for doc in documents:
+        fields = dict(doc)
+        created_at = fields.pop("created_at")
+        operations.append(
+            UpdateOne(
+                {"data_source": doc["data_source"]},
+                {"$set": fields, "$setOnInsert": {"created_at": created_at}},
+                upsert=True,
+            )
+        )
+
+    try:
+        result = collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.matched_count, 0
+    except BulkWriteError as e:
+        # Unordered writes continue past errors; count what went through
+        write_errors = e.details.get("writeErrors", [])
+        logger.warning(f"Batch upsert had {len(write_errors)} errors: {write_errors}")
+        written = e.details.get("nUpserted", 0) + e.details.get("nMatched", 0)
+        return written, len(write_errors)
+
+
+def insert_documents(collection, documents: List[Dict[str, Any]]) -> tuple[int, int]:
+    """
+    Insert a batch of documents into a freshly created collection.
+
+    Args:
+        collection: MongoDB collection to write to
+        documents: Transformed community documents
+
+    Returns:
+        Tuple of (written, failed) document counts
+    """
+    try:
+        result = collection.insert_many(documents, ordered=False)
+        return len(result.inserted_ids), 0
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        logger.warning(f"Batch insert had {len(write_errors)} errors: {write_errors}")
+        return e.details.get("nInserted", 0), len(write_errors)
+
+
+def load_sqlite_to_mongodb(
+    db_path: str = DB_PATH, batch_size: int = 1000, incremental: bool = False
+) -> None:
     """
     Load all communities from SQLite database to MongoDB.
 
     Args:
         db_path: Path to SQLite database file
         batch_size: Number of documents to insert in each batch
+        incremental: Skip communities whose data_source is already in MongoDB
+            instead of refreshing them
     """
     # Validate configuration
     validate_config()
 
     # Connect to MongoDB
     try:
-        mongo_client = MongoClient(MONGODB_URI)
+        mongo_client = get_mongo_client()
         collection = mongo_client[MONGODB_DATABASE][MONGODB_COLLECTION]
         logger.info(
             f"Connected to MongoDB database: {MONGODB_DATABASE}, collection: {MONGODB_COLLECTION}"
@@ -127,87 +299,98 @@ def load_sqlite_to_mongodb(db_path: str = DB_PATH, batch_size: int = 100) -> Non
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
 
+    # An empty collection is loaded with plain inserts and indexed afterwards;
+    # otherwise upserts are keyed on data_source, which needs the index first
+    fresh_load = collection.estimated_document_count() == 0
+    if fresh_load:
+        logger.info("Empty collection, deferring index build until after load")
+        write_documents = insert_documents
+    else:
+        ensure_data_source_index(collection)
+        write_documents = upsert_documents
+
+    # Only the delta needs transforming when loading incrementally
+    existing_sources: set[str] = set()
+    if incremental and not fresh_load:
+        # The app may add communities of its own without a data_source
+        existing_sources = {
+            doc["data_source"]
+            for doc in collection.find(
+                {"data_source": {"$exists": True}}, {"data_source": 1, "_id": 0}
+            )
+        }
+        logger.info(f"Skipping {len(existing_sources)} communities already loaded")
+
     # Connect to SQLite
     conn = get_connection(db_path)
     cursor = conn.cursor()
 
-    # Get all communities from SQLite
-    cursor.execute("SELECT url, enriched_data FROM communities")
-    rows = cursor.fetchall()
-    conn.close()
-
-    total_communities = len(rows)
+    # Count up front so rows can be streamed instead of loaded all at once
+    cursor.execute("SELECT COUNT(*) FROM communities")
+    total_communities = cursor.fetchone()[0]
     logger.info(f"Found {total_communities} communities in SQLite database")
 
     if total_communities == 0:
         logger.warning("No communities found in SQLite database")
+        conn.close()
         return
 
-    documents: List[Dict[str, Any]] = []
+    # Rows are fetched, transformed and written one batch at a time
+    cursor.execute("SELECT url, enriched_data FROM communities")
+
+    # Timestamps are shared by every document in this load
+    now = datetime.now()
+    current_date = now.strftime("%Y-%m-%d")
+    current_timestamp = now.isoformat()
+
     processed = 0
+    skipped = 0
     failed = 0
 
-    for idx, (url, json_data) in enumerate(rows, 1):
-        try:
-            # Parse JSON data from SQLite
-            sqlite_data = json.loads(json_data)
+    while rows := cursor.fetchmany(batch_size):
+        if existing_sources:
+            pending = [row for row in rows if row[0] not in existing_sources]
+            skipped += len(rows) - len(pending)
+            rows = pending
 
-            # Transform to MongoDB format
-            mongo_doc = transform_community_data(sqlite_data, url)
-            documents.append(mongo_doc)
-
-            # Batch insert when batch_size is reached
-            if len(documents) >= batch_size:
-                try:
-                    result = collection.insert_many(documents)
-                    processed += len(result.inserted_ids)
-                    logger.info(
-                        f"Inserted batch: {processed}/{total_communities} communities"
-                    )
-                    documents = []
-                except BulkWriteError as e:
-                    # Handle duplicate key errors or other bulk write errors
-                    failed += len(documents) - len(e.details.get("writeErrors", []))
-                    logger.warning(f"Batch insert had errors: {e.details}")
-                    documents = []
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON for URL {url}: {e}")
-            failed += 1
-        except Exception as e:
-            logger.error(f"Failed to process URL {url}: {e}")
-            failed += 1
+        documents, errors = transform_community_rows(
+            rows, current_date, current_timestamp
+        )
+        failed += errors
 
-    # Insert remaining documents
-    if documents:
-        try:
-            result = collection.insert_many(documents)
-            processed += len(result.inserted_ids)
-            logger.info(
-                f"Inserted final batch: {processed}/{total_communities} communities"
-            )
-        except BulkWriteError as e:
-            failed += len(documents) - len(e.details.get("writeErrors", []))
-            logger.warning(f"Final batch insert had errors: {e.details}")
+        if documents:
+            written, errors = write_documents(collection, documents)
+            processed += written
+            failed += errors
+            logger.info(f"Loaded batch: {processed}/{total_communities} communities")
+
+    conn.close()
+
+    if fresh_load:
+        ensure_data_source_index(collection)
+        logger.info("Built index on data_source")
 
     # Print summary
     logger.info("=" * 50)
     logger.info("📊 Loading Summary:")
     logger.info(f"   Total communities: {total_communities}")
     logger.info(f"   ✅ Successfully loaded: {processed}")
+    logger.info(f"   ⏭️  Skipped (already in MongoDB): {skipped}")
     logger.info(f"   ❌ Failed: {failed}")
     logger.info("=" * 50)
 
-    mongo_client.close()
-
 
 if __name__ == "__main__":
     import sys
     from pathlib import Path
 
+    # --incremental only loads communities not yet in MongoDB
+    incremental = "--incremental" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--incremental"]
+
     # Get database path if provided
-    if len(sys.argv) > 1:
-        db_path = sys.argv[1]
+    if args:
+        db_path = args[0]
     else:
         # Default to communities.db in project root
         project_root = Path(__file__).parent.parent
@@ -217,5 +400,6 @@ if __name__ == "__main__":
         logger.error(f"SQLite database not found: {db_path}")
         sys.exit(1)
 
-    # Load to MongoDB
-    load_sqlite_to_mongodb(str(db_path))
+    # Load to MongoDB, closing the shared client's pool on exit
+    with get_mongo_client():
+        load_sqlite_to_mongodb(str(db_path), incremental=incremental)
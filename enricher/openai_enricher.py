@@ -4,18 +4,52 @@ OpenAI enricher for community data enhancement.
 Basic setup for using OpenAI's chat API to enrich community information.
 """
 
-import os
+import asyncio
 import sys
-import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
 from enum import Enum
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, Optional, List, Any
-from dotenv import load_dotenv
-from agents import Agent, Runner, function_tool
+from agents import Agent, RunContextWrapper, Runner, function_tool
 from agents.agent_output import AgentOutputSchema
 from pydantic import BaseModel
 
+# Add project root to path so the shared config (and its .env load) is used
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import OPENAI_API_KEY  # noqa: E402
 
-load_dotenv()
+# Seconds to wait for a community page before giving up
+FETCH_TIMEOUT = 30
+
+# Fetched pages are cached on disk for a day so re-enrichment runs
+# don't download them again
+FETCH_CACHE_PATH = Path(__file__).parent.parent / "community_cache"
+FETCH_CACHE_EXPIRE = 86400
+
+
+@lru_cache(maxsize=1)
+def _get_session() -> requests_cache.CachedSession:
+    """
+    Get the shared fetch session, creating it (and its cache file) on first use.
+
+    The session is shared so concurrent fetches reuse pooled keep-alive
+    connections.
+    """
+    session = requests_cache.CachedSession(
+        str(FETCH_CACHE_PATH), backend="sqlite", expire_after=FETCH_CACHE_EXPIRE
+    )
+    session.headers.update({"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip"})
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def clear_fetch_cache() -> None:
+    """Drop all cached pages so the next fetches hit the network."""
+    _get_session().cache.clear()
 
 
 class CommunityInfo(BaseModel):
@@ -56,58 +90,11 @@ class OpenAIEnricher:
     Basic OpenAI enricher for community data.
     """
 
-    def __init__(self):
-        """
-        Initialize the OpenAI enricher.
-
-        Args:
-            api_key: OpenAI API key. If not provided, will use OPENAI_API_KEY env var.
-        """
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OpenAI API key is required")
-
-    @function_tool
-    def fetch_url(community_url: str) -> str:
-        """Fetch raw HTML of a URL and return cleaned visible text."""
-        headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(community_url, headers=headers)
-        response.raise_for_status()
-        return response.text
-
-    def enrich_community(
-        self, community_url: str, data_source: str = "maryam_notes"
-    ) -> CommunityInfo:
-        """
-        Enrich community data using OpenAI Chat Completions API.
-
-        Args:
-            community_url: URL of the community to enrich
-            data_source: The source of the data
-
-        Returns:
-            Dictionary with enriched community data
-        """
+    AVAILABLE_TAGS = tuple(tag.value for tag in CommunityTags)
 
-        available_tags = [
-            "Tech",
-            "Career",
-            "Community",
-            "Health",
-            "Finance",
-            "Business",
-            "Parenting",
-            "Arts",
-            "Education",
-            "Science",
-            "Engineering",
-            "Fitness",
-            "Wellness",
-        ]
-
-        agent = Agent(
-            name="Community Enricher",
-            instructions=f"""
+    # Static prompt for str.format: {community_url}, {data_source} and
+    # {available_tags} are filled per run, literal braces are doubled
+    INSTRUCTIONS_TEMPLATE = """
                 You are a specialized community enrichment agent.
                 Your task is to extract and structure comprehensive community information
                 from the provided URL: {community_url}.
@@ -173,30 +160,115 @@ class OpenAIEnricher:
                 Be thorough and return a value for every field. If a piece of information is not found,
                 use a value of `null` for strings and numbers, and `[]` or {{}} for arrays and objects,
                 respectively, to maintain the strict JSON structure.
-            """,
+            """
+
+    # Deriving the output schema introspects the Pydantic model, so do it once
+    OUTPUT_SCHEMA = AgentOutputSchema(CommunityInfo, strict_json_schema=False)
+
+    def __init__(self):
+        """
+        Initialize the OpenAI enricher.
+
+        Args:
+            api_key: OpenAI API key. If not provided, will use OPENAI_API_KEY env var.
+        """
+        if not OPENAI_API_KEY:
+            raise ValueError("OpenAI API key is required")
+
+    @function_tool
+    async def fetch_url(community_url: str) -> str:
+        """Fetch raw HTML of a URL and return cleaned visible text."""
+        # Run the blocking request in a thread so concurrent enrichments
+        # sharing the event loop aren't stalled
+        response = await asyncio.to_thread(
+            _get_session().get, community_url, timeout=FETCH_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.text
+
+    @staticmethod
+    def _render_instructions(
+        run_context: RunContextWrapper[Dict[str, str]], agent: Agent
+    ) -> str:
+        """Fill the instructions template with the URL and source of this run."""
+        return OpenAIEnricher.INSTRUCTIONS_TEMPLATE.format(
+            available_tags=list(OpenAIEnricher.AVAILABLE_TAGS),
+            **run_context.context,
+        )
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _get_agent(cls) -> Agent:
+        """Build the enrichment agent once and share it across runs."""
+        return Agent(
+            name="Community Enricher",
+            instructions=cls._render_instructions,
             # model_settings=(temperature=0.3),
-            tools=[self.fetch_url],
-            output_type=AgentOutputSchema(CommunityInfo, strict_json_schema=False),
+            tools=[cls.fetch_url],
+            output_type=cls.OUTPUT_SCHEMA,
         )
 
+    def enrich_community(
+        self, community_url: str, data_source: str = "maryam_notes"
+    ) -> CommunityInfo:
+        """
+        Enrich community data using OpenAI Chat Completions API.
+
+        Args:
+            community_url: URL of the community to enrich
+            data_source: The source of the data
+
+        Returns:
+            Dictionary with enriched community data
+        """
+
+        agent = self._get_agent()
         result = Runner.run_sync(
             agent,
             f"Enrich this community site: {community_url}",
+            context={"community_url": community_url, "data_source": data_source},
         )
 
         data = result.final_output_as(CommunityInfo)
         return data
 
+    async def enrich_community_async(
+        self, community_url: str, data_source: str = "maryam_notes"
+    ) -> CommunityInfo:
+        """
+        Enrich community data on the running event loop.
+
+        Use this to run several enrichments concurrently on one loop; the
+        SDK's shared HTTP client is bound to the loop it was first used on.
+
+        Args:
+            community_url: URL of the community to enrich
+            data_source: The source of the data
+
+        Returns:
+            Enriched community data
+        """
+        result = await Runner.run(
+            self._get_agent(),
+            f"Enrich this community site: {community_url}",
+            context={"community_url": community_url, "data_source": data_source},
+        )
+
+        return result.final_output_as(CommunityInfo)
+
 
 if __name__ == "__main__":
     enricher = OpenAIEnricher()
     # Use sys.argv to get command-line arguments
-    if len(sys.argv) < 2:
-        print("Usage: python3 openai_enricher.py <url1> [<url2> ...]")
+    # sys.argv[0] is the script name; slice from 1 to get the URLs
+    community_sites = [arg for arg in sys.argv[1:] if arg != "--refresh"]
+    if not community_sites:
+        print("Usage: python3 openai_enricher.py [--refresh] <url1> [<url2> ...]")
         sys.exit(1)
 
-    # sys.argv[0] is the script name; slice from 1 to get the URLs
-    community_sites = sys.argv[1:]
+    # --refresh re-downloads pages instead of using the fetch cache
+    if "--refresh" in sys.argv:
+        clear_fetch_cache()
 
     for site in community_sites:
         print(f"Url No: {community_sites.index(site) + 1}/{len(community_sites)}")
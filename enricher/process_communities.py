@@ -3,12 +3,25 @@ Process community URLs from CSV file and enrich them using OpenAI enricher.
 Stores results in SQLite database, skipping URLs that already exist.
 """
 
+import asyncio
 import os
 import sys
-import csv
+import sqlite3
 from pathlib import Path
-from openai_enricher import OpenAIEnricher
-from database import init_database, url_exists, save_community_data, DB_PATH
+from openai_enricher import OpenAIEnricher, clear_fetch_cache
+from database import (
+    init_database,
+    get_connection,
+    get_all_urls,
+    save_community_data,
+    DB_PATH,
+)
+
+# Number of saved communities grouped into a single transaction
+COMMIT_EVERY = 20
+
+# Number of URLs enriched concurrently
+MAX_CONCURRENT = 10
 
 
 def read_urls_from_csv(csv_path: str) -> list[str]:
@@ -24,16 +37,12 @@ def read_urls_from_csv(csv_path: str) -> list[str]:
     urls = []
 
     with open(csv_path, "r", encoding="utf-8") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            if row and row[0].strip():
-                # Clean URL - remove trailing comma and any notes
-                url = row[0].strip().rstrip(",")
-                # Remove any notes after comma (like "keep an eye - not free")
-                if "," in url:
-                    url = url.split(",")[0].strip()
-                if url:
-                    urls.append(url)
+        for line in file:
+            # URL is the first column; drop any notes after the comma
+            # (like "keep an eye - not free")
+            url = line.split(",", 1)[0].strip()
+            if url:
+                urls.append(url)
 
     return urls
 
@@ -46,8 +55,95 @@ def process_communities(csv_path: str, db_path: str = DB_PATH) -> None:
         csv_path: Path to the CSV file containing URLs
         db_path: Path to the SQLite database file
     """
+    # Open a single connection reused for every database call in this run
+    conn = get_connection(db_path)
+    try:
+        _process_urls(csv_path, db_path, conn)
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        # Keep rows already enriched even if the run is interrupted
+        if conn.in_transaction:
+            conn.commit()
+        conn.close()
+
+
+async def _enrich_and_save(
+    enricher: OpenAIEnricher,
+    urls: list[str],
+    db_path: str,
+    conn: sqlite3.Connection,
+) -> tuple[int, int]:
+    """
+    Enrich URLs concurrently and save each result as soon as it completes.
+
+    All enrichments share one event loop (the Agents SDK HTTP client is
+    loop-bound). Saves run between awaits on this thread, so SQLite still
+    sees a single writer. If the run is interrupted, asyncio.run cancels the
+    enrichments that haven't finished.
+
+    Args:
+        enricher: Enricher used for every URL
+        urls: URLs to enrich
+        db_path: Path to the SQLite database file
+        conn: Open SQLite connection
+
+    Returns:
+        Tuple of (processed, failed) counts
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+
+    async def enrich(url: str):
+        async with semaphore:
+            try:
+                return url, await enricher.enrich_community_async(url), None
+            except Exception as e:
+                return url, None, e
+
+    processed = 0
+    failed = 0
+
+    tasks = [asyncio.create_task(enrich(url)) for url in urls]
+    for idx, next_done in enumerate(asyncio.as_completed(tasks), 1):
+        url, enriched_data, error = await next_done
+        print(f"\n[{idx}/{len(urls)}] Processing: {url}")
+
+        if error is not None:
+            print(f"❌ Failed to process {url}: {error}")
+            failed += 1
+            continue
+
+        try:
+            # Save to database
+            save_community_data(db_path, url, enriched_data, conn=conn)
+            print("✅ Successfully enriched and saved to database")
+            processed += 1
+
+            if processed % COMMIT_EVERY == 0:
+                conn.commit()
+
+        except Exception as e:
+            print(f"❌ Failed to process {url}: {e}")
+            failed += 1
+
+    return processed, failed
+
+
+def _process_urls(csv_path: str, db_path: str, conn: sqlite3.Connection) -> None:
+    """
+    Enrich all URLs from the CSV file using a shared database connection.
+
+    Args:
+        csv_path: Path to the CSV file containing URLs
+        db_path: Path to the SQLite database file
+        conn: Open SQLite connection
+    """
     # Initialize database
-    init_database(db_path)
+    init_database(db_path, conn=conn)
+
+    # Preload existing URLs so the skip check is an in-memory lookup
+    existing_urls = set(get_all_urls(db_path, conn=conn))
 
     # Read URLs from CSV
     print(f"📖 Reading URLs from {csv_path}...")
@@ -61,35 +157,26 @@ def process_communities(csv_path: str, db_path: str = DB_PATH) -> None:
         print(f"❌ Error initializing enricher: {e}")
         sys.exit(1)
 
-    # Process each URL
+    # Filter out URLs already in the database (or repeated in the CSV)
     total = len(urls)
-    processed = 0
     skipped = 0
-    failed = 0
-
-    for idx, url in enumerate(urls, 1):
-        print(f"\n[{idx}/{total}] Processing: {url}")
 
-        # Check if URL already exists
-        if url_exists(db_path, url):
-            print("⏭️  URL already exists in database, skipping...")
+    pending = []
+    for url in urls:
+        if url in existing_urls:
+            print(f"⏭️  Already in database, skipping: {url}")
             skipped += 1
             continue
+        existing_urls.add(url)
+        pending.append(url)
 
-        # Enrich the community
-        try:
-            print("🔄 Enriching community data...")
-            enriched_data = enricher.enrich_community(url)
+    # Enrich concurrently on one event loop; saves happen as results arrive
+    print(f"\n🔄 Enriching {len(pending)} communities, {MAX_CONCURRENT} at a time...")
+    processed, failed = asyncio.run(
+        _enrich_and_save(enricher, pending, db_path, conn)
+    )
 
-            # Save to database
-            save_community_data(db_path, url, enriched_data)
-            print("✅ Successfully enriched and saved to database")
-            processed += 1
-
-        except Exception as e:
-            print(f"❌ Failed to process {url}: {e}")
-            failed += 1
-            continue
+    conn.commit()
 
     # Print summary
     print("\n" + "=" * 50)
@@ -102,9 +189,13 @@ def process_communities(csv_path: str, db_path: str = DB_PATH) -> None:
 
 
 if __name__ == "__main__":
+    # --refresh re-downloads pages instead of using the fetch cache
+    refresh = "--refresh" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--refresh"]
+
     # Get CSV file path
-    if len(sys.argv) > 1:
-        csv_path = sys.argv[1]
+    if args:
+        csv_path = args[0]
     else:
         # Default to data/mata_connect.csv relative to project root
         project_root = Path(__file__).parent.parent
@@ -114,5 +205,8 @@ if __name__ == "__main__":
         print(f"❌ CSV file not found: {csv_path}")
         sys.exit(1)
 
+    if refresh:
+        clear_fetch_cache()
+
     # Process communities
     process_communities(str(csv_path))